@@ -22,14 +22,24 @@ class Adafruit_10DOF(object):
     # Average sea level pressure in hPa
     PRESSURE_SEALEVELHPA = 1013.25
     
-    def __init__(self):
+    def __init__(self, busnum=-1):
         '''
-        Initializes the sensors on the 10-DOF board
+        Initializes the sensors on the 10-DOF board on the given I2C bus,
+        or the default bus if busnum is -1
         '''
         # Create instances of each of the sensors
-        self.accelMag = Adafruit_LSM303()
-        self.gyro = Adafruit_L3GD20()
-        self.barom = BMP085()
+        self.busnum = busnum
+        self.accelMag = Adafruit_LSM303(busnum)
+        self.gyro = Adafruit_L3GD20(busnum)
+        self.barom = BMP085(busnum=busnum) if busnum != -1 else BMP085()
+        
+        # Optional filter (see Sensor_filters) applied to every pressure
+        # reading, and so also to the altitude.  Any filter with an
+        # update() method works; decimating filters (Cic_decimator) only
+        # produce a new value every few readings, in between the last
+        # filtered value is returned.
+        self.pressure_filter = None
+        self._filtered_pressure = None
         
     def accel_get_orientation(self):
         '''
@@ -49,7 +59,7 @@ class Adafruit_10DOF(object):
         '''
         Gets the raw (x, y, z) accelerometer data in units of m/s^2
         '''
-        return self.accelMag.read()[0]
+        return self.accelMag.readAccel()
         
     def mag_get_orientation(self):
         '''
@@ -62,7 +72,7 @@ class Adafruit_10DOF(object):
         '''
         Gets the raw (x, y, z) heading in degrees along each axis from magnetic north
         '''
-        return  self.accelMag.read()[1]
+        return self.accelMag.readMag()
     
     def gyro_get_raw(self):
         '''
@@ -98,9 +108,18 @@ class Adafruit_10DOF(object):
     
     def get_pressure(self):
         '''
-        Gets the pressure in Pa
-        '''
-        return self.barom.read_pressure()
+        Gets the pressure in Pa, filtered by pressure_filter if one is set
+        '''
+        press = self.barom.read_pressure()
+        if self.pressure_filter is not None:
+            filtered = self.pressure_filter.update(press)
+            if filtered is not None:
+                self._filtered_pressure = filtered
+            # Until a decimating filter has produced its first output, fall
+            # back to the raw reading
+            if self._filtered_pressure is not None:
+                press = self._filtered_pressure
+        return press
     
     def get_temperature(self):
         '''
@@ -108,6 +127,35 @@ class Adafruit_10DOF(object):
         '''
         return self.barom.read_temperature()
     
+    def accel_get_stamped(self):
+        '''
+        Gets a (timestamp, (x, y, z)) accelerometer sample in m/s^2, where
+        timestamp is the monotonic time of the read in seconds
+        '''
+        accel = self.accel_get_raw()
+        return (self.accelMag.accel_timestamp, accel)
+    
+    def mag_get_stamped(self):
+        '''
+        Gets a (timestamp, (x, y, z)) magnetometer sample
+        '''
+        mag = self.mag_get_raw()
+        return (self.accelMag.mag_timestamp, mag)
+    
+    def gyro_get_stamped(self):
+        '''
+        Gets a (timestamp, (x, y, z)) gyro sample in rad/s
+        '''
+        gyro = self.gyro_get_raw()
+        return (self.gyro.timestamp, gyro)
+    
+    def get_pressure_stamped(self):
+        '''
+        Gets a (timestamp, pressure) sample with the pressure in Pa
+        '''
+        press = self.get_pressure()
+        return (self.barom.timestamp, press)
+    
     def get_altitude(self):
         '''
         Gets the approximate altitude above sea level in m
@@ -23,6 +23,8 @@ import time
 
 import Adafruit_GPIO.I2C as I2C
 
+from Clock import monotonic
+
 
 # BMP085 default address.
 BMP085_I2CADDR           = 0x77
@@ -66,6 +68,8 @@ class BMP085(object):
         self._device = I2C.Device(address, busnum)
         # Load calibration values.
         self._load_calibration()
+        # Monotonic time of the most recent temperature/pressure conversion.
+        self.timestamp = None
 
     def _load_calibration(self):
         self.cal_AC1 = self._device.readS16BE(BMP085_CAL_AC1)   # INT16
@@ -111,6 +115,7 @@ class BMP085(object):
         self._device.write8(BMP085_CONTROL, BMP085_READTEMPCMD)
         time.sleep(0.005)  # Wait 5ms
         raw = self._device.readU16BE(BMP085_TEMPDATA)
+        self.timestamp = monotonic()
         self._logger.debug('Raw temp 0x{0:X} ({1})'.format(raw & 0xFFFF, raw))
         return raw
 
@@ -128,6 +133,7 @@ class BMP085(object):
         msb = self._device.readU8(BMP085_PRESSUREDATA)
         lsb = self._device.readU8(BMP085_PRESSUREDATA+1)
         xlsb = self._device.readU8(BMP085_PRESSUREDATA+2)
+        self.timestamp = monotonic()
         raw = ((msb << 16) + (lsb << 8) + xlsb) >> (8 - self._mode)
         self._logger.debug('Raw pressure 0x{0:04X} ({1})'.format(raw & 0xFFFF, raw))
         return raw
@@ -10,6 +10,7 @@ the Adafruit GPIO library.
 '''
 
 from Adafruit_I2C import Adafruit_I2C
+from Clock import monotonic
 
 class Adafruit_L3GD20(Adafruit_I2C):
     '''
@@ -51,6 +52,9 @@ class Adafruit_L3GD20(Adafruit_I2C):
         # Set the range to the default value (250dps)
         self.gyro.write8(self.GYRO_REGISTER_CTRL_REG4, 0x00)
         
+        # Monotonic time of the most recent read(), None until first read
+        self.timestamp = None
+        
     def gyro16(self, blist, idx):
         '''
         Properly formats the 16 bits of data as an integer.
@@ -65,6 +69,7 @@ class Adafruit_L3GD20(Adafruit_I2C):
     def read(self):
         # Read 6 bytes of data from the gyros
         blist = self.gyro.readList(self.GYRO_REGISTER_OUT_X_L | 0x80, 6)
+        self.timestamp = monotonic()
         
         # Return a tuple with the (x, y, z) gyro readings in rad/s
         res = (self.gyro16(blist, 0) * self.GYRO_SENSITIVITY_250DPS * self.DPS_TO_RAD, 
@@ -31,8 +31,13 @@
 #     Fixed self parameter issue with setMagGain
 #     Initialized the mag gain in the constructor
 #     Removed unimplemented mag orientation
+#
+# Modified 10/19/26:
+#     Timestamp accelerometer and magnetometer samples
+#     Split read() into readAccel() and readMag()
 
 from Adafruit_I2C import Adafruit_I2C
+from Clock import monotonic
 
 
 class Adafruit_LSM303(Adafruit_I2C):
@@ -90,6 +95,10 @@ class Adafruit_LSM303(Adafruit_I2C):
         
         # Set the gain on the magnetometer to default value
         self.setMagGain()
+
+        # Monotonic time of the most recent accel/mag reads
+        self.accel_timestamp = None
+        self.mag_timestamp = None
         
 
     # Interpret signed 12-bit acceleration component from list
@@ -106,20 +115,26 @@ class Adafruit_LSM303(Adafruit_I2C):
 
 
     def read(self):
-        # Read the accelerometer
+        return [self.readAccel(), self.readMag()]
+
+
+    # Read only the accelerometer, (x, y, z) in m/s^2
+    def readAccel(self):
         blist = self.accel.readList(
           self.LSM303_REGISTER_ACCEL_OUT_X_L_A | 0x80, 6)
-        res = [( self.accel12(blist, 0) * self.LSM303_ACCEL_MG_LSB * self.GRAVITY_EARTH,
+        self.accel_timestamp = monotonic()
+        return ( self.accel12(blist, 0) * self.LSM303_ACCEL_MG_LSB * self.GRAVITY_EARTH,
                  self.accel12(blist, 2) * self.LSM303_ACCEL_MG_LSB * self.GRAVITY_EARTH,
-                 self.accel12(blist, 4) * self.LSM303_ACCEL_MG_LSB * self.GRAVITY_EARTH )]
+                 self.accel12(blist, 4) * self.LSM303_ACCEL_MG_LSB * self.GRAVITY_EARTH )
 
-        # Read the magnetometer
-        blist = self.mag.readList(self.LSM303_REGISTER_MAG_OUT_X_H_M, 6)
-        res.append((self.mag16(blist, 0) / self.LSM303_MAG_GAUSS_LSB_XY * self.GAUSS_TO_MICROTESLA,
-                    self.mag16(blist, 2) / self.LSM303_MAG_GAUSS_LSB_XY * self.GAUSS_TO_MICROTESLA,
-                    self.mag16(blist, 4) / self.LSM303_MAG_GAUSS_LSB_Z * self.GAUSS_TO_MICROTESLA))
 
-        return res
+    # Read only the magnetometer, (x, y, z) in uT
+    def readMag(self):
+        blist = self.mag.readList(self.LSM303_REGISTER_MAG_OUT_X_H_M, 6)
+        self.mag_timestamp = monotonic()
+        return (self.mag16(blist, 0) / self.LSM303_MAG_GAUSS_LSB_XY * self.GAUSS_TO_MICROTESLA,
+                self.mag16(blist, 2) / self.LSM303_MAG_GAUSS_LSB_XY * self.GAUSS_TO_MICROTESLA,
+                self.mag16(blist, 4) / self.LSM303_MAG_GAUSS_LSB_Z * self.GAUSS_TO_MICROTESLA)
 
 
     def setMagGain(self, gain=LSM303_MAGGAIN_1_3):
@@ -0,0 +1,35 @@
+'''
+Created on Oct 19, 2026
+
+Monotonic time source used to timestamp sensor samples.  Sample
+times must never jump backwards when the system clock is adjusted
+(e.g. by NTP after the Beaglebone finds a network).
+'''
+import time
+
+try:
+    monotonic = time.monotonic
+except AttributeError:
+    # Python 2 has no monotonic clock in the standard library, so read
+    # CLOCK_MONOTONIC from librt directly
+    import ctypes
+    import ctypes.util
+
+    CLOCK_MONOTONIC = 1     # from <linux/time.h>
+
+    class _timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+    _librt = ctypes.CDLL(ctypes.util.find_library('rt') or 'librt.so.1', use_errno=True)
+    _clock_gettime = _librt.clock_gettime
+    _clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(_timespec)]
+
+    def monotonic():
+        '''
+        Returns the time in seconds from CLOCK_MONOTONIC
+        '''
+        t = _timespec()
+        if _clock_gettime(CLOCK_MONOTONIC, ctypes.byref(t)) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, 'clock_gettime failed')
+        return t.tv_sec + t.tv_nsec * 1e-9
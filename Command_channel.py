@@ -0,0 +1,451 @@
+'''
+Created on Oct 19, 2026
+
+A pipelined request/response command channel over a tcp connection.
+Every request carries an id, so the ground station can have many
+commands in flight at once and the rover can answer them in any
+order, instead of waiting a full round trip per command.
+
+Messages are JSON objects, each prefixed with its length as a 4 byte
+big-endian integer:
+    request:    {"id": 7, "command": "get_altitude", "args": []}
+    response:   {"id": 7, "result": 231.5} or {"id": 7, "error": "..."}
+'''
+import json
+import struct
+import threading
+from socket import timeout as socket_timeout
+
+from Clock import monotonic
+
+try:
+    from Queue import Queue
+except ImportError:
+    from queue import Queue
+
+# Length prefix of each message
+HEADER = struct.Struct('>I')
+
+# Bytes read from the socket at a time
+CHUNK_SIZE = 4096
+
+# Longest message accepted, far above any real command or response.  A
+# longer length prefix means the stream is corrupt.
+MAX_MESSAGE = 1 << 20
+
+
+class Command_error(Exception):
+    '''
+    Raised when the remote end failed to run a command
+    '''
+    pass
+
+
+class Command_timeout(Exception):
+    '''
+    Raised when no response to a command arrived in time
+    '''
+    pass
+
+
+def _socket_of(connection):
+    '''
+    Returns the socket of a Tcp_client, or the connection itself if it
+    already is a socket (e.g. one returned by accept() on the other end)
+    '''
+    return getattr(connection, 'socket', connection)
+
+
+class Message_stream(object):
+    '''
+    Sends and receives length-prefixed JSON messages on a socket.  Sending
+    is thread safe, receiving must be done from a single thread.
+    '''
+
+    def __init__(self, sock):
+        '''
+        Wraps a connected socket
+        '''
+        self.socket = sock
+        self._buffer = bytearray()
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        '''
+        Sends a message.  Raises ValueError if it is longer than MAX_MESSAGE.
+        '''
+        data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+        if len(data) > MAX_MESSAGE:
+            raise ValueError('Message of {0} bytes is longer than {1}'.format(len(data), MAX_MESSAGE))
+        with self._send_lock:
+            self.socket.sendall(HEADER.pack(len(data)) + data)
+
+    def receive(self):
+        '''
+        Returns the next message.  Returns None if the socket timed out
+        before a whole message arrived, and raises EOFError if the
+        connection was closed.  A length prefix above MAX_MESSAGE leaves no
+        way to find the next message, so the socket is closed and EOFError
+        raised.
+        '''
+        buf = self._buffer
+        while True:
+            if len(buf) >= HEADER.size:
+                (length, ) = HEADER.unpack(bytes(buf[:HEADER.size]))
+                if length > MAX_MESSAGE:
+                    del buf[:]
+                    self.socket.close()
+                    raise EOFError('Message length {0} is longer than {1}'.format(length, MAX_MESSAGE))
+                end = HEADER.size + length
+                if len(buf) >= end:
+                    data = bytes(buf[HEADER.size:end])
+                    del buf[:end]
+                    return json.loads(data.decode('utf-8'))
+            try:
+                chunk = self.socket.recv(CHUNK_SIZE)
+            except socket_timeout:
+                return None
+            if not chunk:
+                raise EOFError('Connection closed')
+            buf.extend(chunk)
+
+
+class Pending_command(object):
+    '''
+    A command that has been sent and whose response may not have
+    arrived yet
+    '''
+
+    def __init__(self, client, request_id, command, deadline):
+        '''
+        Creates a pending command of a Command_client that times out at the
+        given monotonic time
+        '''
+        self.client = client
+        self.id = request_id
+        self.command = command
+        self.deadline = deadline
+        self._event = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _complete(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._event.set()
+
+    def done(self):
+        '''
+        Returns True once a response, error or timeout has been recorded
+        '''
+        return self._event.is_set()
+
+    def result(self):
+        '''
+        Waits for the response and returns its result.  Raises
+        Command_error if the command failed on the remote end and
+        Command_timeout if the response did not arrive by the deadline.
+        '''
+        self._event.wait(max(self.deadline - monotonic(), 0))
+        if not self._event.is_set():
+            # Give up on the command and free its slot.  If the response
+            # is being handled right now this is a no-op and the wait
+            # below returns as soon as it completes.
+            self.client._finish(self.id, error=_timeout_error(self))
+            self._event.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def _timeout_error(pending):
+    return Command_timeout('No response to {0} (id {1})'.format(pending.command, pending.id))
+
+
+class Command_client(object):
+    '''
+    Sends commands over a connection and matches the responses to them
+    as they arrive, in any order.  A background thread reads responses.
+    '''
+
+    # Default per-request timeout in seconds
+    TIMEOUT = 1.0
+
+    # Requests in flight before call_async() blocks
+    MAX_IN_FLIGHT = 32
+
+    def __init__(self, connection, max_in_flight=MAX_IN_FLIGHT):
+        '''
+        Starts a command client on a connected Tcp_client or socket
+        '''
+        self.stream = Message_stream(_socket_of(connection))
+        self.max_in_flight = max_in_flight
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self._next_id = 0
+        self._running = True
+        self._reader = threading.Thread(target=self._read_responses)
+        self._reader.daemon = True
+        self._reader.start()
+
+    def call_async(self, command, args=(), timeout=TIMEOUT):
+        '''
+        Sends a command without waiting for the response and returns a
+        Pending_command for it.  If max_in_flight commands are already
+        pending, waits for one to finish or expire; raises Command_timeout
+        if no slot frees up within timeout.
+        '''
+        deadline = monotonic() + timeout
+        expired = []
+        try:
+            with self._lock:
+                expired.extend(self._expire_locked())
+                while self._running and len(self._pending) >= self.max_in_flight:
+                    now = monotonic()
+                    if now >= deadline:
+                        raise Command_timeout('No free slot for {0} within {1}s'.format(command, timeout))
+                    # Wake up when a slot frees or the oldest command expires
+                    wake = min([deadline] + [p.deadline for p in self._pending.values()])
+                    self._slot_free.wait(max(wake - now, 0.001))
+                    expired.extend(self._expire_locked())
+                if not self._running:
+                    raise EOFError('Command channel is closed')
+                request_id = self._next_id
+                self._next_id += 1
+                pending = Pending_command(self, request_id, command, deadline)
+                self._pending[request_id] = pending
+        finally:
+            for old in expired:
+                old._complete(error=_timeout_error(old))
+        try:
+            self.stream.send({'id': request_id, 'command': command, 'args': list(args)})
+        except Exception as e:
+            self._finish(request_id, error=e)
+            raise
+        return pending
+
+    def call(self, command, args=(), timeout=TIMEOUT):
+        '''
+        Sends a command and waits for its result
+        '''
+        return self.call_async(command, args, timeout).result()
+
+    def _remove_locked(self, request_id):
+        '''
+        Removes a pending command and frees its slot.  The lock must be held.
+        '''
+        pending = self._pending.pop(request_id, None)
+        if pending is not None:
+            self._slot_free.notify()
+        return pending
+
+    def _expire_locked(self):
+        '''
+        Removes and returns the commands whose deadline has passed.  The
+        lock must be held; the caller completes them after releasing it.
+        '''
+        now = monotonic()
+        expired = [p for p in self._pending.values() if p.deadline < now]
+        for pending in expired:
+            self._remove_locked(pending.id)
+        return expired
+
+    def _finish(self, request_id, result=None, error=None):
+        '''
+        Completes a pending command and frees its slot.  Does nothing if
+        the command already completed or timed out.
+        '''
+        with self._lock:
+            pending = self._remove_locked(request_id)
+        if pending is not None:
+            pending._complete(result, error)
+
+    def _expire(self):
+        '''
+        Fails the commands whose deadline has passed
+        '''
+        with self._lock:
+            expired = self._expire_locked()
+        for pending in expired:
+            pending._complete(error=_timeout_error(pending))
+
+    def _read_responses(self):
+        '''
+        Reads responses until the connection is closed.  Malformed responses
+        and responses without an id are skipped; the command they were
+        meant for times out.
+        '''
+        try:
+            while self._running:
+                try:
+                    response = self.stream.receive()
+                except ValueError:
+                    # Not valid JSON, already taken off the stream
+                    continue
+                if response is None:
+                    self._expire()
+                elif not isinstance(response, dict) or 'id' not in response:
+                    pass
+                elif 'error' in response:
+                    self._finish(response['id'], error=Command_error(response['error']))
+                else:
+                    self._finish(response['id'], result=response.get('result'))
+        except Exception as e:
+            self._close(e)
+
+    def _close(self, error):
+        '''
+        Fails every pending command with the given error
+        '''
+        with self._lock:
+            self._running = False
+            request_ids = list(self._pending.keys())
+            # Wake up callers waiting for a slot so they see the close
+            self._slot_free.notify_all()
+        for request_id in request_ids:
+            self._finish(request_id, error=error)
+
+    def close(self):
+        '''
+        Stops the client and fails any commands still in flight.  The
+        connection itself is left open.
+        '''
+        self._close(EOFError('Command channel is closed'))
+
+
+class Command_server(object):
+    '''
+    Reads commands from a connection and runs them with registered
+    handlers.  Handlers are grouped into lanes, each with its own worker
+    thread: commands in one lane run in the order they arrived, while
+    a slow command in one lane does not hold up the others.
+    '''
+
+    def __init__(self, connection):
+        '''
+        Creates a command server on a connected Tcp_client or socket
+        '''
+        self.stream = Message_stream(_socket_of(connection))
+        self.handlers = {}
+        self._lanes = {}
+        self._running = False
+
+    def register(self, command, handler, lane='default'):
+        '''
+        Registers a handler function called with the command arguments.
+        Its return value must be JSON serializable.
+        '''
+        if lane not in self._lanes:
+            queue = Queue()
+            worker = threading.Thread(target=self._work, args=(queue, ))
+            worker.daemon = True
+            worker.start()
+            self._lanes[lane] = queue
+        self.handlers[command] = (handler, self._lanes[lane])
+
+    def _work(self, queue):
+        '''
+        Runs the requests of one lane until None is queued
+        '''
+        while True:
+            request = queue.get()
+            if request is None:
+                return
+            (handler, request_id, args) = request
+            try:
+                response = {'id': request_id, 'result': handler(*args)}
+            except Exception as e:
+                response = {'id': request_id, 'error': '{0}: {1}'.format(type(e).__name__, e)}
+            try:
+                try:
+                    self.stream.send(response)
+                except (TypeError, ValueError) as e:
+                    # The result could not be serialized
+                    self.stream.send({'id': request_id, 'error': '{0}: {1}'.format(type(e).__name__, e)})
+            except Exception:
+                # The connection is gone, serve_forever() will notice
+                pass
+
+    def _dispatch(self, request):
+        '''
+        Queues a request on the lane of its handler, or answers it with an
+        error if it cannot be run.  Requests without an id cannot be
+        answered and are dropped.
+        '''
+        if not isinstance(request, dict) or 'id' not in request:
+            return
+        request_id = request['id']
+        command = request.get('command')
+        args = request.get('args', [])
+        try:
+            (handler, queue) = self.handlers[command]
+        except (KeyError, TypeError):
+            self.stream.send({'id': request_id, 'error': 'Unknown command {0}'.format(command)})
+            return
+        if not isinstance(args, list):
+            self.stream.send({'id': request_id, 'error': 'Arguments of {0} must be a list'.format(command)})
+            return
+        queue.put((handler, request_id, args))
+
+    def serve_forever(self):
+        '''
+        Reads and dispatches commands until the connection is closed or
+        close() is called.  Malformed messages are skipped.
+        '''
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    request = self.stream.receive()
+                except ValueError:
+                    # Not valid JSON.  The message has already been taken
+                    # off the stream, so carry on with the next one.
+                    continue
+                if request is not None:
+                    self._dispatch(request)
+        except EOFError:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        '''
+        Stops reading commands and stops the lane workers once they have
+        finished the commands already queued
+        '''
+        self._running = False
+        for queue in self._lanes.values():
+            queue.put(None)
+        self._lanes = {}
+
+
+def rover_server(connection, rover, dof, mailbox=None):
+    '''
+    Creates a Command_server that drives a Rover and reads an
+    Adafruit_10DOF.  Motor commands and sensor reads are in separate
+    lanes so a velocity command never waits behind a barometer read.
+    If a Command_mailbox is given, velocity commands are posted to it
+    for an Actuation_loop instead of being applied directly.  Senders
+    should then pass the monotonic time they sent each command as the
+    optional fourth argument of set_velocities, so that commands are
+    aged from when they were sent rather than when they arrived.
+    '''
+    from utilities import Vec2
+    from Command_mailbox import Sender_clock
+
+    server = Command_server(connection)
+    sender_clock = Sender_clock()
+
+    def set_velocities(x, y, angular_velocity, sent=None):
+        if mailbox is not None:
+            timestamp = None if sent is None else sender_clock.to_local(sent)
+            return mailbox.post(Vec2(x, y), angular_velocity, timestamp)
+        rover.set_velocities(Vec2(x, y), angular_velocity)
+
+    server.register('set_velocities', set_velocities, 'motors')
+    for name in ('accel_get_orientation', 'accel_get_raw', 'mag_get_orientation',
+                 'mag_get_raw', 'gyro_get_raw', 'fusion_get_orientation',
+                 'get_pressure', 'get_temperature', 'get_altitude'):
+        server.register(name, getattr(dof, name), 'sensors')
+    return server
@@ -0,0 +1,209 @@
+'''
+Created on Oct 19, 2026
+
+A latest-wins mailbox for velocity commands between the network
+thread and the motor loop.  Commands can arrive faster than the
+motors are updated, so instead of queueing them, each new command
+replaces any that has not been applied yet.  The motor loop always
+acts on the newest setpoint at its own rate.  A command that is too
+old by the time it would be applied stops the rover instead, and so
+does the motor loop if no new command arrives in time.
+'''
+import threading
+import time
+from collections import namedtuple
+
+from Clock import monotonic
+from utilities import Vec2
+
+# A velocity setpoint: a sequence number increasing with every post, the
+# monotonic time it was sent (or posted, if the sender gave no time), and
+# the arguments of Rover.set_velocities
+Velocity_command = namedtuple('Velocity_command',
+                              ['sequence', 'timestamp', 'linear_velocity', 'angular_velocity'])
+
+
+class Command_mailbox(object):
+    '''
+    Holds the newest velocity command not yet taken by the motor loop
+    '''
+
+    # Commands older than this many seconds when taken stop the rover
+    MAX_AGE = 0.25
+
+    def __init__(self, max_age=MAX_AGE):
+        '''
+        Creates an empty mailbox
+        '''
+        self.max_age = max_age
+        self._command = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+        # Metrics
+        self.posted = 0      # commands posted
+        self.coalesced = 0   # commands replaced before they were taken
+        self.taken = 0       # commands handed to the motor loop
+        self.stale = 0       # commands replaced by a stop for being older than max_age
+
+    def post(self, linear_velocity, angular_velocity, timestamp=None):
+        '''
+        Posts a new setpoint, replacing any that has not been taken yet.
+        timestamp is the monotonic time the command was sent, see
+        Sender_clock, and defaults to now.  Returns its sequence number.
+        '''
+        if timestamp is None:
+            timestamp = monotonic()
+        with self._lock:
+            self._sequence += 1
+            if self._command is not None:
+                self.coalesced += 1
+            self._command = Velocity_command(self._sequence, timestamp,
+                                             linear_velocity, angular_velocity)
+            self.posted += 1
+            self._ready.set()
+            return self._sequence
+
+    def take(self):
+        '''
+        Removes and returns the newest command, or None if there is no new
+        command.  If the command is older than max_age it is counted as
+        stale and a stop command (zero velocity, same sequence number and
+        timestamp) is returned in its place, so the rover does not keep
+        running on an even older setpoint.
+        '''
+        with self._lock:
+            command = self._command
+            self._command = None
+            self._ready.clear()
+            if command is None:
+                return None
+            if monotonic() - command.timestamp > self.max_age:
+                self.stale += 1
+                return Velocity_command(command.sequence, command.timestamp, Vec2(0, 0), 0.0)
+            self.taken += 1
+            return command
+
+    def wait(self, timeout=None):
+        '''
+        Waits until a command is posted.  Returns True if one is waiting.
+        '''
+        return self._ready.wait(timeout)
+
+    def metrics(self):
+        '''
+        Returns a dict of the command counters
+        '''
+        with self._lock:
+            return {'posted': self.posted, 'coalesced': self.coalesced,
+                    'taken': self.taken, 'stale': self.stale}
+
+
+class Sender_clock(object):
+    '''
+    Converts the send times of a remote sender's monotonic clock to this
+    machine's monotonic clock.  The offset between the clocks is taken
+    from the fastest delivery seen so far, so the converted times include
+    any network delay above that, and a command that sat in a socket
+    buffer is seen to be as old as it is.
+    '''
+
+    def __init__(self):
+        '''
+        Creates a converter that has not seen any send times yet
+        '''
+        self.offset = None
+
+    def to_local(self, sent, now=None):
+        '''
+        Returns the local monotonic time of a command sent at the sender's
+        time sent and received now
+        '''
+        if now is None:
+            now = monotonic()
+        offset = now - sent
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        return sent + self.offset
+
+
+class Actuation_loop(object):
+    '''
+    Applies the newest command from a mailbox to a Rover at a fixed rate.
+    If the setpoint being applied gets older than the mailbox's max_age
+    without a new command arriving, e.g. because the ground station
+    stopped sending, the loop stops the rover (the deadman).
+    '''
+
+    # Motor update period in seconds, the 50Hz PWM period of the motors
+    PERIOD = 0.02
+
+    def __init__(self, rover, mailbox, period=PERIOD):
+        '''
+        Creates a loop driving the rover from the mailbox
+        '''
+        self.rover = rover
+        self.mailbox = mailbox
+        self.period = period
+        self.last_command = None
+        self.deadman_stops = 0   # times the rover was stopped for lack of commands
+        self._moving = False
+        self._running = False
+
+    def step(self):
+        '''
+        Applies the newest command if there is one, or stops the rover if it
+        was stale.  Without a new command, stops the rover once the last
+        command is older than max_age.  Returns the command applied, or None.
+        '''
+        command = self.mailbox.take()
+        if command is not None:
+            self.rover.set_velocities(command.linear_velocity, command.angular_velocity)
+            self.last_command = command
+            self._moving = (command.linear_velocity.length_squared() != 0 or
+                            command.angular_velocity != 0)
+        elif self._moving and monotonic() - self.last_command.timestamp > self.mailbox.max_age:
+            self.rover.set_velocities(Vec2(0, 0), 0.0)
+            self.deadman_stops += 1
+            self._moving = False
+        return command
+
+    def run(self):
+        '''
+        Runs the loop in the calling thread until stop() is called
+        '''
+        self._running = True
+        self._loop()
+
+    def _loop(self):
+        '''
+        Runs ticks at the loop period while the loop is running
+        '''
+        next_time = monotonic()
+        while self._running:
+            self.step()
+            # Sleep until the next tick, skipping ticks that were missed
+            next_time += self.period
+            delay = next_time - monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = monotonic()
+
+    def start(self):
+        '''
+        Runs the loop in a background thread and returns the thread
+        '''
+        # Set before the thread starts so that an early stop() is not lost
+        self._running = True
+        thread = threading.Thread(target=self._loop)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def stop(self):
+        '''
+        Stops the loop after the current tick
+        '''
+        self._running = False
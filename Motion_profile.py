@@ -0,0 +1,349 @@
+'''
+Created on Oct 19, 2026
+
+Precomputed motion profiles for the rover.  A route, given either as
+waypoints or as a list of body twists to hold, is turned ahead of time
+into a velocity profile that respects acceleration limits, sampled at
+the control period.  Each sample holds the time, the body twist and
+the four wheel speeds, so the control loop only has to look up the
+current sample and write it to the motors.
+
+Two ramp shapes are available: TRAPEZOID (constant acceleration) and
+S_CURVE (sinusoidal acceleration, no step in acceleration).
+
+Waypoint routes are in meters, with speeds in m/s and accelerations in
+m/s^2, and are converted to motor commands with FULL_SCALE_SPEED.
+Twists, as in Rover.set_velocities, are motor commands between -1 and
+1, with accelerations in commands per second.
+
+Profiles are built without touching the hardware, so they can be
+computed and cached ahead of time on any machine.  Whether the rover
+has mecanum wheels is therefore passed in rather than read from
+Rover.wheel_type.
+'''
+import hashlib
+import os
+import time
+from math import ceil, pi, sqrt
+
+import numpy as np
+
+from Clock import monotonic
+from utilities import Vec2Array, FULL_SCALE_SPEED, WHEEL_TO_COG, wheel_speeds
+
+# Ramp shapes
+TRAPEZOID = 'trapezoid'
+S_CURVE = 's_curve'
+
+# Ramp time relative to a constant acceleration ramp with the same peak
+# acceleration.  A sine ramp peaks at pi/2 times its mean acceleration.
+_RAMP_FACTOR = {TRAPEZOID: 1.0, S_CURVE: pi / 2}
+
+# Columns of the profile array
+COLUMNS = ['time', 'x', 'y', 'angular', 'front_left', 'front_right', 'back_left', 'back_right']
+
+
+def _ramp(s, shape):
+    '''
+    Fraction of a velocity change completed at fraction s of the ramp
+    '''
+    if shape == TRAPEZOID:
+        return s
+    return (1 - np.cos(pi * s)) / 2
+
+
+def _check_shape(shape):
+    if shape not in _RAMP_FACTOR:
+        raise ValueError('Unexpected shape value {0}.  Set shape to TRAPEZOID or S_CURVE'.format(shape))
+
+
+def move_speeds(distance, max_speed, max_accel, dt, shape=TRAPEZOID):
+    '''
+    Returns the speeds, sampled every dt seconds, of a move over distance
+    that starts and ends at rest without exceeding max_speed or max_accel.
+    Speeds are in distance units per second, e.g. m/s for a distance in m.
+    '''
+    _check_shape(shape)
+    if distance <= 0:
+        return np.zeros(1)
+    factor = _RAMP_FACTOR[shape]
+
+    # Short moves never reach max_speed and have no cruise phase
+    speed = min(max_speed, sqrt(distance * max_accel / factor))
+    ramp_time = factor * speed / max_accel
+    total_time = 2 * ramp_time + (distance - speed * ramp_time) / speed
+
+    t = np.arange(int(ceil(total_time / dt)) + 1) * dt
+    accel = _ramp(np.clip(t / ramp_time, 0, 1), shape)
+    decel = _ramp(np.clip((total_time - t) / ramp_time, 0, 1), shape)
+    return speed * np.minimum(accel, decel)
+
+
+class Motion_profile(object):
+    '''
+    A precomputed profile: an (N, 8) float32 array with one row per
+    control period, see COLUMNS
+    '''
+
+    # Control period in seconds, matching the motor update rate
+    PERIOD = 0.02
+
+    def __init__(self, dt, data, mecanum):
+        '''
+        Creates a profile from its sample period and array, built for
+        mecanum wheels or not
+        '''
+        self.dt = float(dt)
+        self.data = data
+        self.mecanum = bool(mecanum)
+
+    @classmethod
+    def from_twists_array(cls, twists, dt, mecanum):
+        '''
+        Creates a profile from an (N, 3) array of (x, y, angular) body
+        twists, computing the wheel speeds the same way Rover does.  Without
+        mecanum wheels the x components are ignored.
+        '''
+        twists = np.array(twists, dtype=float)
+        if not mecanum:
+            twists[:, 0] = 0.0
+
+        # Scale down samples that the motors cannot reach, as the clamp in
+        # Rover.set_velocities would
+        combined = np.abs(twists[:, 0]) + np.abs(twists[:, 1]) + np.abs(WHEEL_TO_COG * twists[:, 2])
+        twists /= np.maximum(combined, 1.0)[:, np.newaxis]
+
+        data = np.empty((len(twists), len(COLUMNS)), dtype=np.float32)
+        data[:, 0] = np.arange(len(twists)) * dt
+        data[:, 1:4] = twists
+        data[:, 4:8] = np.column_stack(wheel_speeds(twists[:, 0], twists[:, 1], twists[:, 2]))
+        return cls(dt, data, mecanum)
+
+    @classmethod
+    def from_waypoints(cls, waypoints, max_speed, max_accel, mecanum, dt=PERIOD, shape=TRAPEZOID):
+        '''
+        Creates a profile driving in straight lines through a list of (x, y)
+        or Vec2 waypoints in meters, relative to the rover's starting
+        position, stopping at each one.  The rover does not turn.  max_speed
+        is in m/s and max_accel in m/s^2.
+        '''
+        points = Vec2Array(waypoints)
+        legs = Vec2Array(points.data[1:] - points.data[:-1])
+        if not mecanum and np.any(legs.x != 0):
+            raise ValueError('non-mecanum wheels do not support movement in the x direction')
+
+        directions = legs.normalized()
+        twists = [np.zeros((1, 3))]
+        for (direction, length) in zip(directions.data, legs.lengths()):
+            if length == 0:
+                # Repeated waypoint, the rover is already there
+                continue
+            # The motors saturate once |x| + |y| of the command reaches 1, and
+            # the clamp would then scale the leg short of its waypoint
+            leg_speed = min(max_speed, FULL_SCALE_SPEED / (abs(direction[0]) + abs(direction[1])))
+            # Each leg starts where the previous one stopped.  Convert m/s to
+            # motor commands.
+            speeds = move_speeds(length, leg_speed, max_accel, dt, shape)[1:] / FULL_SCALE_SPEED
+            leg = np.zeros((len(speeds), 3))
+            leg[:, 0] = direction[0] * speeds
+            leg[:, 1] = direction[1] * speeds
+            twists.append(leg)
+        return cls.from_twists_array(np.vstack(twists), dt, mecanum)
+
+    @classmethod
+    def from_twists(cls, segments, max_accel, max_angular_accel, mecanum, dt=PERIOD, shape=TRAPEZOID):
+        '''
+        Creates a profile from a list of (linear_velocity, angular_velocity,
+        duration) segments, each a body twist in motor commands as taken by
+        Rover.set_velocities to hold for duration seconds.  max_accel and
+        max_angular_accel are in commands per second.  Changes between
+        segments are ramped within the acceleration limits and the profile
+        ramps back to rest at the end.
+        '''
+        _check_shape(shape)
+        factor = _RAMP_FACTOR[shape]
+        limits = np.array([max_accel, max_accel, max_angular_accel], dtype=float)
+        current = np.zeros(3)
+        twists = [current[np.newaxis, :]]
+        for (linear_velocity, angular_velocity, duration) in list(segments) + [((0, 0), 0, 0)]:
+            target = np.array([linear_velocity[0], linear_velocity[1], angular_velocity], dtype=float)
+            ramp_steps = int(ceil(factor * np.max(np.abs(target - current) / limits) / dt))
+            if ramp_steps > 0:
+                s = _ramp(np.arange(1, ramp_steps + 1) / float(ramp_steps), shape)
+                twists.append(current + (target - current) * s[:, np.newaxis])
+            hold_steps = int(round(duration / dt)) - ramp_steps
+            if hold_steps > 0:
+                twists.append(np.tile(target, (hold_steps, 1)))
+            current = target
+        return cls.from_twists_array(np.vstack(twists), dt, mecanum)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Loads a profile saved with save()
+        '''
+        with np.load(path) as archive:
+            return cls(float(archive['dt']), archive['data'], bool(archive['mecanum']))
+
+    def save(self, path):
+        '''
+        Saves the profile to a .npz file
+        '''
+        np.savez(path, dt=self.dt, data=self.data, mecanum=self.mecanum)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def times(self):
+        return self.data[:, 0]
+
+    @property
+    def twists(self):
+        return self.data[:, 1:4]
+
+    @property
+    def wheels(self):
+        return self.data[:, 4:8]
+
+    def duration(self):
+        '''
+        Returns the time of the last sample in seconds
+        '''
+        return (len(self.data) - 1) * self.dt
+
+    def index_at(self, elapsed):
+        '''
+        Returns the index of the sample in effect elapsed seconds into the
+        profile, which is the last sample once the profile has finished
+        '''
+        index = int(elapsed / self.dt)
+        if index < 0:
+            return 0
+        return min(index, len(self.data) - 1)
+
+
+class Profile_player(object):
+    '''
+    Streams a Motion_profile into a Rover, writing the wheel speeds of the
+    current sample on every tick
+    '''
+
+    def __init__(self, rover, profile):
+        '''
+        Creates a player for the profile
+        '''
+        if profile.mecanum and rover.wheel_type != 'mecanum':
+            raise ValueError('Profile was built for mecanum wheels but the rover has {0} wheels'.format(rover.wheel_type))
+        self.rover = rover
+        self.profile = profile
+        # Plain floats, so a tick is a list lookup and four motor writes
+        self._wheels = profile.wheels.tolist()
+        self._start = None
+        self._running = False
+
+    def start(self, now=None):
+        '''
+        Starts the profile at the given monotonic time, or now
+        '''
+        self._start = monotonic() if now is None else now
+
+    def step(self, now=None):
+        '''
+        Applies the sample for the current time.  Returns False once the
+        last sample has been applied.
+        '''
+        if self._start is None:
+            self.start(now)
+        if now is None:
+            now = monotonic()
+        index = int((now - self._start) / self.profile.dt)
+        last = len(self._wheels) - 1
+        if index > last:
+            index = last
+        self.rover.set_wheel_speeds(*self._wheels[index])
+        return index < last
+
+    def run(self, period=Motion_profile.PERIOD):
+        '''
+        Plays the whole profile, blocking until it finishes or stop() is
+        called.  If stopped early the motors are stopped too.
+        '''
+        self._running = True
+        self.start()
+        next_time = self._start
+        while self._running and self.step():
+            next_time += period
+            delay = next_time - monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = monotonic()
+        if not self._running:
+            self.rover.set_wheel_speeds(0.0, 0.0, 0.0, 0.0)
+        self._running = False
+
+    def stop(self):
+        '''
+        Stops run() after the current tick
+        '''
+        self._running = False
+
+
+class Profile_cache(object):
+    '''
+    Keeps built profiles so repeated routes are only computed once,
+    optionally also saving them in a directory to reuse across runs
+    '''
+
+    # Part of the saved file names.  Increase it whenever a change to the
+    # code would build a different profile for the same key.
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory=None):
+        '''
+        Creates a cache, kept only in memory if directory is None
+        '''
+        self.directory = directory
+        self._profiles = {}
+
+    def _path(self, key):
+        # Saved profiles also depend on the rover constants they were built with
+        key = (self.FORMAT_VERSION, WHEEL_TO_COG, FULL_SCALE_SPEED, key)
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.npz')
+
+    def get(self, key, build):
+        '''
+        Returns the profile for a hashable key, calling build() to create
+        it if it is not cached
+        '''
+        profile = self._profiles.get(key)
+        if profile is not None:
+            return profile
+        if self.directory is not None and os.path.exists(self._path(key)):
+            profile = Motion_profile.load(self._path(key))
+        else:
+            profile = build()
+            if self.directory is not None:
+                profile.save(self._path(key))
+        self._profiles[key] = profile
+        return profile
+
+    def waypoints(self, waypoints, max_speed, max_accel, mecanum, dt=Motion_profile.PERIOD, shape=TRAPEZOID):
+        '''
+        Returns the cached Motion_profile.from_waypoints() profile for a route
+        '''
+        points = tuple((float(p[0]), float(p[1])) for p in waypoints)
+        key = ('waypoints', points, max_speed, max_accel, bool(mecanum), dt, shape)
+        return self.get(key, lambda: Motion_profile.from_waypoints(
+            points, max_speed, max_accel, mecanum, dt, shape))
+
+    def twists(self, segments, max_accel, max_angular_accel, mecanum, dt=Motion_profile.PERIOD, shape=TRAPEZOID):
+        '''
+        Returns the cached Motion_profile.from_twists() profile for a route
+        '''
+        segments = tuple(((float(l[0]), float(l[1])), float(w), float(d)) for (l, w, d) in segments)
+        key = ('twists', segments, max_accel, max_angular_accel, bool(mecanum), dt, shape)
+        return self.get(key, lambda: Motion_profile.from_twists(
+            segments, max_accel, max_angular_accel, mecanum, dt, shape))
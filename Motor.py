@@ -13,7 +13,7 @@ Date: 2/24/14
 # Import the Adafruit library.  This has already been installed on the Beaglebone.
 import Adafruit_BBIO.PWM as PWM
 
-def class Motor:
+class Motor:
 	
 	FREQ = 50 # PWM frequency in Hz
 	DUTY_MIN = 5 # Minimum pulse width as percent of frequency
@@ -61,7 +61,7 @@ def class Motor:
 			speed *= -1
 
 		# Get the necessary duty cycle for the speed and set the PWM output to this duty cycle
-		duty_cycle = get_duty_cycle(speed)
+		duty_cycle = self.get_duty_cycle(speed)
 		PWM.set_duty_cycle(self.pin, duty_cycle)
 		
 	def cleanup(self):
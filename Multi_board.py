@@ -0,0 +1,142 @@
+'''
+Created on Oct 19, 2026
+
+Reads several Adafruit 10-DOF boards, each on its own I2C bus, at the
+same time.  Each board is read by its own thread; the I2C transfers
+release the GIL, so a cycle over several boards takes about as long
+as reading a single board.  The readings are merged into one
+timestamped multi-IMU frame.
+'''
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+from Adafruit_10DOF import Adafruit_10DOF
+from Clock import monotonic
+
+# A merged frame: the monotonic time the cycle started, the time it took
+# in seconds, and a dict of board name -> dict of stamped samples
+Multi_imu_frame = namedtuple('Multi_imu_frame', ['timestamp', 'cycle_time', 'boards'])
+
+
+def read_board(dof, pressure=False):
+    '''
+    Reads one board and returns a dict of its (timestamp, value) samples
+    keyed 'accel', 'gyro', 'mag' and, if requested, 'pressure'.  The
+    barometer is skipped by default since it needs over 10ms per read.
+    '''
+    samples = {'accel': dof.accel_get_stamped(),
+               'gyro': dof.gyro_get_stamped(),
+               'mag': dof.mag_get_stamped()}
+    if pressure:
+        samples['pressure'] = dof.get_pressure_stamped()
+    return samples
+
+
+class Latency_stats(object):
+    '''
+    Running read latency statistics in seconds
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        '''
+        Records one latency
+        '''
+        self.count += 1
+        self.total += latency
+        self.last = latency
+        if latency > self.max:
+            self.max = latency
+
+    def mean(self):
+        '''
+        Returns the mean latency, or 0 before the first one
+        '''
+        return self.total / self.count if self.count else 0.0
+
+    def __str__(self):
+        return 'n={0} mean={1:.2f}ms max={2:.2f}ms last={3:.2f}ms'.format(
+            self.count, self.mean() * 1000, self.max * 1000, self.last * 1000)
+
+
+class Multi_board_reader(object):
+    '''
+    Reads a set of named boards in parallel
+    '''
+
+    def __init__(self, boards, read=read_board):
+        '''
+        boards is a dict of name -> Adafruit_10DOF.  read is called with a
+        board and returns its samples.
+        '''
+        self.boards = boards
+        self.read_function = read
+        self._names = sorted(boards)
+        self._pool = ThreadPool(len(boards))
+        self.board_stats = dict((name, Latency_stats()) for name in self._names)
+        self.cycle_stats = Latency_stats()
+
+    @classmethod
+    def from_buses(cls, buses, read=read_board):
+        '''
+        Creates a reader with one board on each of the given I2C bus
+        numbers, named 'bus<number>'
+        '''
+        return cls(dict(('bus{0}'.format(busnum), Adafruit_10DOF(busnum)) for busnum in buses), read)
+
+    def _read(self, name):
+        '''
+        Reads one board and records how long it took
+        '''
+        start = monotonic()
+        samples = self.read_function(self.boards[name])
+        return (samples, monotonic() - start)
+
+    def read(self):
+        '''
+        Reads every board and returns a Multi_imu_frame
+        '''
+        start = monotonic()
+        results = self._pool.map(self._read, self._names)
+        cycle_time = monotonic() - start
+        self.cycle_stats.add(cycle_time)
+
+        frame = {}
+        for (name, (samples, latency)) in zip(self._names, results):
+            self.board_stats[name].add(latency)
+            frame[name] = samples
+        return Multi_imu_frame(start, cycle_time, frame)
+
+    def stats(self):
+        '''
+        Returns a dict of board name -> Latency_stats, with the stats of
+        whole cycles under 'cycle'
+        '''
+        stats = dict(self.board_stats)
+        stats['cycle'] = self.cycle_stats
+        return stats
+
+    def close(self):
+        '''
+        Stops the reader threads
+        '''
+        self._pool.close()
+        self._pool.join()
+
+
+# Reads boards on I2C buses 1 and 2 and prints the latency stats
+if __name__ == '__main__':
+    from time import sleep
+
+    reader = Multi_board_reader.from_buses([1, 2])
+    while True:
+        for _ in range(100):
+            reader.read()
+            sleep(0.01)
+        for (name, stats) in sorted(reader.stats().items()):
+            print('{0}: {1}'.format(name, stats))
@@ -4,11 +4,11 @@ Main rover class
 
 
 
-import Motor.py
-import utiliies.py
+from Motor import Motor
+from utilities import WHEEL_TO_COG, wheel_speeds
 
 
-def class Rover:
+class Rover:
 	
 	
 	wheel_type = "leg"
@@ -25,27 +25,32 @@ def class Rover:
 		self.back_left.cleanup()
 		self.back_right.cleanup()
 	
-	def set_velocities(linear_velocity, angular_velocity):
+	def set_velocities(self, linear_velocity, angular_velocity):
 		"""
 		Sets the velocity of the robot
 		linear_velocity: Vec2 representing the velocity in the x and y directions
 		angular_velocity: float representing the desired angular velocity
 		"""
-		if(wheel_type != "mecanum" && linear_velocity.x != 0.0):
+		if(self.wheel_type != "mecanum" and linear_velocity.x != 0.0):
 			print("non-mecanum wheels do not support movement in the x direction. Ignoring x component")
 			linear_velocity.x = 0.0
-		wheel_to_cog = 1.0	# distance from wheel to center of gravity in x direction plus distance from wheel to center of gravity in y direction.
 		
 		# clamp speeds if necessary
-		max_combined_speed = Math.abs(linear_velocity.x) + Math.abs(linear_velocity.y) + Math.abs(wheel_to_cog * angular_velocity)
+		max_combined_speed = abs(linear_velocity.x) + abs(linear_velocity.y) + abs(WHEEL_TO_COG * angular_velocity)
 		if(max_combined_speed > 1.0):
 			linear_velocity /= max_combined_speed
 			angular_velocity /= max_combined_speed 
 		
-		self.front_left.set_speed(linear_velocity.x - linear_velocity.y - wheel_to_cog * angular_velocity)
-		self.front_right.set_speed(linear_velocity.x + linear_velocity.y + wheel_to_cog * angular_velocity)
-		self.back_left.set_speed(linear_velocity.x + linear_velocity.y - wheel_to_cog * angular_velocity)
-		self.back_right.set_speed(linear_velocity.x - linear_velocity.y + wheel_to_cog * angular_velocity)
+		self.set_wheel_speeds(*wheel_speeds(linear_velocity.x, linear_velocity.y, angular_velocity))
+	
+	def set_wheel_speeds(self, front_left, front_right, back_left, back_right):
+		"""
+		Sets the speed of each motor directly, e.g. from a precomputed motion profile
+		"""
+		self.front_left.set_speed(front_left)
+		self.front_right.set_speed(front_right)
+		self.back_left.set_speed(back_left)
+		self.back_right.set_speed(back_right)
 		
 
 
@@ -0,0 +1,340 @@
+'''
+Created on Oct 19, 2026
+
+Streaming filters for smoothing and decimating sensor data.  Every
+filter keeps preallocated state and does a constant amount of work
+per sample in update(), so long windows and high sample rates cost
+no more per sample than short ones.  process() runs a whole NumPy
+array of samples through the filter in one call and continues from
+the same state as update().
+'''
+from math import pi, sin, cos
+
+import numpy as np
+
+
+class Moving_average(object):
+    '''
+    Boxcar average of the last window samples, kept as a running sum
+    over a ring buffer.  Until window samples have been seen the output
+    is the average of all samples so far.
+    '''
+
+    def __init__(self, window):
+        '''
+        Creates a moving average over the given number of samples
+        '''
+        if window < 1:
+            raise ValueError('Moving average window must be at least 1')
+        self.window = int(window)
+        self.reset()
+
+    def reset(self):
+        '''
+        Clears the filter state
+        '''
+        self._buffer = [0.0] * self.window
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, x):
+        '''
+        Adds a sample and returns the filtered value
+        '''
+        buf = self._buffer
+        i = self._index
+        self._sum += x - buf[i]
+        buf[i] = x
+        i += 1
+        self._index = i if i < self.window else 0
+        if self._count < self.window:
+            self._count += 1
+        return self._sum / self._count
+
+    def _history(self):
+        '''
+        Returns the buffered samples, oldest first
+        '''
+        if self._count < self.window:
+            return self._buffer[:self._count]
+        return self._buffer[self._index:] + self._buffer[:self._index]
+
+    def process(self, x):
+        '''
+        Filters an array of samples, returning an array of the same length
+        '''
+        x = np.asarray(x, dtype=float)
+        hist = self._history()
+        ext = np.concatenate((hist, x))
+        csum = np.concatenate(([0.0], np.cumsum(ext)))
+
+        # Window end (exclusive) and start for each new sample
+        end = np.arange(len(hist) + 1, len(ext) + 1)
+        start = np.maximum(end - self.window, 0)
+        out = (csum[end] - csum[start]) / (end - start)
+
+        # Carry the newest samples over as the new state.  The sum is
+        # recomputed, which also discards accumulated rounding error.
+        tail = ext[-self.window:].tolist()
+        self._count = len(tail)
+        self._index = len(tail) % self.window
+        self._buffer = tail + [0.0] * (self.window - len(tail))
+        self._sum = sum(tail)
+        return out
+
+
+class Exponential_filter(object):
+    '''
+    First order IIR low-pass filter (exponential moving average).
+    The first sample initializes the output.
+    '''
+
+    def __init__(self, alpha):
+        '''
+        Creates a filter with smoothing factor alpha between 0 (output
+        never changes) and 1 (no filtering)
+        '''
+        if not 0 < alpha <= 1:
+            raise ValueError('Exponential filter alpha must be in (0, 1]')
+        self.alpha = float(alpha)
+        self.reset()
+
+    @classmethod
+    def from_cutoff(cls, cutoff, sample_rate):
+        '''
+        Creates a filter with the given -3dB cutoff frequency in Hz for
+        samples arriving at sample_rate Hz
+        '''
+        dt = 1.0 / sample_rate
+        rc = 1.0 / (2 * pi * cutoff)
+        return cls(dt / (rc + dt))
+
+    def reset(self):
+        '''
+        Clears the filter state
+        '''
+        self.value = None
+
+    def update(self, x):
+        '''
+        Adds a sample and returns the filtered value
+        '''
+        if self.value is None:
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def process(self, x):
+        '''
+        Filters an array of samples, returning an array of the same length
+        '''
+        update = self.update
+        return np.array([update(v) for v in np.asarray(x, dtype=float).tolist()])
+
+
+class Biquad(object):
+    '''
+    Second order IIR section in transposed direct form II.  The state is
+    initialized to steady state on the first sample so that large offsets
+    such as atmospheric pressure do not cause a startup transient.
+    '''
+
+    def __init__(self, b0, b1, b2, a1, a2):
+        '''
+        Creates a section with the normalized coefficients of
+        H(z) = (b0 + b1 z^-1 + b2 z^-2) / (1 + a1 z^-1 + a2 z^-2)
+        '''
+        self.b0 = float(b0)
+        self.b1 = float(b1)
+        self.b2 = float(b2)
+        self.a1 = float(a1)
+        self.a2 = float(a2)
+        self.reset()
+
+    @classmethod
+    def lowpass(cls, cutoff, sample_rate, q=0.7071):
+        '''
+        Creates a low-pass section with the given cutoff frequency in Hz for
+        samples arriving at sample_rate Hz.  The default q gives a
+        Butterworth response.
+        '''
+        w0 = 2 * pi * cutoff / sample_rate
+        alpha = sin(w0) / (2 * q)
+        a0 = 1 + alpha
+        b1 = (1 - cos(w0)) / a0
+        return cls(b1 / 2, b1, b1 / 2, -2 * cos(w0) / a0, (1 - alpha) / a0)
+
+    def reset(self):
+        '''
+        Clears the filter state
+        '''
+        self._z1 = None
+        self._z2 = 0.0
+
+    def update(self, x):
+        '''
+        Adds a sample and returns the filtered value
+        '''
+        if self._z1 is None:
+            # Steady state output for a constant input x
+            y = x * (self.b0 + self.b1 + self.b2) / (1 + self.a1 + self.a2)
+            self._z1 = y - self.b0 * x
+            self._z2 = self.b2 * x - self.a2 * y
+        y = self.b0 * x + self._z1
+        self._z1 = self.b1 * x - self.a1 * y + self._z2
+        self._z2 = self.b2 * x - self.a2 * y
+        return y
+
+    def process(self, x):
+        '''
+        Filters an array of samples, returning an array of the same length
+        '''
+        update = self.update
+        return np.array([update(v) for v in np.asarray(x, dtype=float).tolist()])
+
+
+class Cic_decimator(object):
+    '''
+    Cascaded integrator-comb decimator.  Averages over factor samples
+    with order cascaded boxcar stages and outputs every factor-th
+    result, reducing the sample rate by factor.  The integrator/comb
+    pairs are implemented as Moving_average stages so the gain is
+    normalized to 1 and the floating point state cannot grow without
+    bound.
+    '''
+
+    def __init__(self, factor, order=1):
+        '''
+        Creates a decimator reducing the rate by factor with order stages
+        '''
+        if factor < 1 or order < 1:
+            raise ValueError('CIC factor and order must be at least 1')
+        self.factor = int(factor)
+        self.stages = [Moving_average(factor) for _ in range(order)]
+        self._phase = 0
+
+    def reset(self):
+        '''
+        Clears the filter state
+        '''
+        for stage in self.stages:
+            stage.reset()
+        self._phase = 0
+
+    def update(self, x):
+        '''
+        Adds a sample.  Returns the filtered value every factor-th sample
+        and None otherwise.
+        '''
+        for stage in self.stages:
+            x = stage.update(x)
+        self._phase += 1
+        if self._phase < self.factor:
+            return None
+        self._phase = 0
+        return x
+
+    def process(self, x):
+        '''
+        Filters an array of samples, returning only the decimated outputs
+        '''
+        for stage in self.stages:
+            x = stage.process(x)
+        first = self.factor - 1 - self._phase
+        self._phase = (self._phase + len(x)) % self.factor
+        return x[first::self.factor]
+
+
+class Filter_chain(object):
+    '''
+    Runs samples through a sequence of filters.  A decimating stage that
+    has no output for a sample ends the chain for that sample.
+    '''
+
+    def __init__(self, *stages):
+        '''
+        Creates a chain of the given filters, applied in order
+        '''
+        self.stages = list(stages)
+
+    def reset(self):
+        '''
+        Clears the state of every stage
+        '''
+        for stage in self.stages:
+            stage.reset()
+
+    def update(self, x):
+        '''
+        Adds a sample and returns the filtered value, or None if a
+        decimating stage dropped it
+        '''
+        for stage in self.stages:
+            x = stage.update(x)
+            if x is None:
+                return None
+        return x
+
+    def process(self, x):
+        '''
+        Filters an array of samples
+        '''
+        for stage in self.stages:
+            x = stage.process(x)
+        return x
+
+
+class Axis_filters(object):
+    '''
+    Filters each axis of a vector sensor, e.g. (x, y, z) accelerometer
+    readings, with its own instance of a filter.
+    '''
+
+    def __init__(self, make_filter, axes=3):
+        '''
+        Creates one filter per axis by calling make_filter()
+        '''
+        self.filters = [make_filter() for _ in range(axes)]
+
+    def reset(self):
+        '''
+        Clears the state of every axis
+        '''
+        for filt in self.filters:
+            filt.reset()
+
+    def update(self, value):
+        '''
+        Adds a sample tuple and returns the filtered tuple, or None if the
+        filters are decimating and dropped it
+        '''
+        out = tuple(filt.update(v) for (filt, v) in zip(self.filters, value))
+        return None if out[0] is None else out
+
+    def process(self, x):
+        '''
+        Filters an (n, axes) array of samples
+        '''
+        x = np.asarray(x, dtype=float)
+        return np.column_stack([filt.process(x[:, i]) for (i, filt) in enumerate(self.filters)])
+
+
+def filtered(read, filt, stamped=False):
+    '''
+    Wraps a sensor getter such as Adafruit_10DOF.accel_get_raw so that
+    every reading passes through filt.  Stamped getters returning
+    (timestamp, value) samples keep their timestamps.  Readings dropped
+    by a decimating filter are returned as None, which Sensor_sync.Sampler
+    skips.
+    '''
+    if stamped:
+        def read_filtered():
+            (timestamp, value) = read()
+            value = filt.update(value)
+            return None if value is None else (timestamp, value)
+    else:
+        def read_filtered():
+            return filt.update(read())
+    return read_filtered
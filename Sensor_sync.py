@@ -0,0 +1,233 @@
+'''
+Created on Oct 19, 2026
+
+Aligns the multi-rate sensor streams of the Adafruit 10-DOF board
+onto a common clock.  The accelerometer, gyro, magnetometer and
+barometer all run at different rates, so each stream is buffered
+with its sample timestamps and resampled at fixed intervals into
+synchronized frames, either by linear interpolation or by holding
+the most recent sample (zero-order hold).
+'''
+from collections import deque, namedtuple
+
+from Clock import monotonic
+
+# Resampling modes
+INTERPOLATE = 'interpolate'
+HOLD = 'hold'
+
+# A synchronized frame: the common timestamp and a dict of
+# stream name -> resampled value
+Sync_frame = namedtuple('Sync_frame', ['timestamp', 'values'])
+
+
+def _lerp(a, b, frac):
+    '''
+    Linearly interpolates between two samples, which may be either
+    numbers or tuples of numbers
+    '''
+    if isinstance(a, tuple):
+        return tuple(ai + (bi - ai) * frac for (ai, bi) in zip(a, b))
+    return a + (b - a) * frac
+
+
+class Sample_stream(object):
+    '''
+    A bounded buffer of (timestamp, value) samples from a single sensor.
+    Samples must be pushed in time order.
+    '''
+
+    # Number of samples kept by default.  Only a couple of samples around
+    # the current frame time are needed, the rest absorbs jitter.
+    DEFAULT_MAXLEN = 32
+
+    def __init__(self, mode=INTERPOLATE, maxlen=DEFAULT_MAXLEN):
+        '''
+        Creates an empty stream resampled with the given mode
+        '''
+        if mode not in (INTERPOLATE, HOLD):
+            raise ValueError('Unexpected mode value {0}.  Set mode to INTERPOLATE or HOLD'.format(mode))
+        self.mode = mode
+        self.samples = deque(maxlen=maxlen)
+
+    def push(self, timestamp, value):
+        '''
+        Adds a sample to the stream.  Returns False and drops the sample
+        if it is not newer than the last sample.
+        '''
+        if self.samples and timestamp <= self.samples[-1][0]:
+            return False
+        self.samples.append((timestamp, value))
+        return True
+
+    def ready(self, timestamp):
+        '''
+        Returns True if the stream can produce a value at the given time
+        without waiting for more samples
+        '''
+        if not self.samples:
+            return False
+        if self.mode == HOLD:
+            return self.samples[0][0] <= timestamp
+        return self.samples[-1][0] >= timestamp
+
+    def value_at(self, timestamp):
+        '''
+        Returns the resampled value of the stream at the given time.
+        Times before the oldest buffered sample get the oldest value.
+        '''
+        after = None
+        # Frame times are close to the newest samples, so search backwards
+        for sample in reversed(self.samples):
+            if sample[0] <= timestamp:
+                if after is None or self.mode == HOLD:
+                    return sample[1]
+                frac = (timestamp - sample[0]) / (after[0] - sample[0])
+                return _lerp(sample[1], after[1], frac)
+            after = sample
+        return after[1]
+
+    def discard_before(self, timestamp):
+        '''
+        Drops samples that are no longer needed to resample at or after
+        the given time
+        '''
+        samples = self.samples
+        while len(samples) > 1 and samples[1][0] <= timestamp:
+            samples.popleft()
+
+
+class Stream_aligner(object):
+    '''
+    Resamples a set of named sample streams onto a common clock with a
+    fixed period and emits synchronized frames.
+    '''
+
+    def __init__(self, period):
+        '''
+        Creates an aligner producing one frame every period seconds
+        '''
+        self.period = float(period)
+        self.streams = {}
+        self._start = None
+        self._index = 0
+
+    def add_stream(self, name, mode=INTERPOLATE, maxlen=Sample_stream.DEFAULT_MAXLEN):
+        '''
+        Adds a stream to the aligner.  Fast sensors should be interpolated,
+        slow sensors held so that frames are not delayed waiting for them.
+        '''
+        self.streams[name] = Sample_stream(mode, maxlen)
+
+    def push(self, name, timestamp, value):
+        '''
+        Adds a sample to the named stream
+        '''
+        return self.streams[name].push(timestamp, value)
+
+    def next_time(self):
+        '''
+        Returns the time of the next frame to be emitted, or None if some
+        stream has not produced a sample yet
+        '''
+        if self._start is None:
+            return None
+        return self._start + self._index * self.period
+
+    def poll(self):
+        '''
+        Returns a list of all frames that can be produced from the samples
+        buffered so far
+        '''
+        frames = []
+        streams = self.streams
+        if not streams:
+            return frames
+        for stream in streams.values():
+            if not stream.samples:
+                return frames
+
+        # Start (or restart after a stall that overflowed the buffers) the
+        # frame clock at the first time every stream has data for
+        oldest = max(stream.samples[0][0] for stream in streams.values())
+        if self._start is None or self.next_time() < oldest - self.period:
+            self._start = oldest
+            self._index = 0
+
+        timestamp = self.next_time()
+        while all(stream.ready(timestamp) for stream in streams.values()):
+            values = dict((name, stream.value_at(timestamp)) for (name, stream) in streams.items())
+            frames.append(Sync_frame(timestamp, values))
+            self._index += 1
+            timestamp = self.next_time()
+
+        # Keep memory bounded by the streams' buffers and the search short
+        for stream in streams.values():
+            stream.discard_before(timestamp)
+        return frames
+
+
+class Sampler(object):
+    '''
+    Reads stamped sensor sources, each at its own rate, and feeds the
+    samples into a Stream_aligner.  Sensors are only read once their
+    period has elapsed so slow sensors are not oversampled.
+    '''
+
+    def __init__(self, aligner):
+        '''
+        Creates a sampler feeding the given aligner
+        '''
+        self.aligner = aligner
+        self.sources = []
+
+    def add_source(self, name, period, read, mode=INTERPOLATE):
+        '''
+        Adds a source read every period seconds.  read must return a
+        (timestamp, value) sample, or None if it has no new sample (e.g. a
+        source wrapped in a decimating filter by Sensor_filters.filtered).
+        '''
+        self.aligner.add_stream(name, mode)
+        # [name, period, read function, time the next read is due]
+        self.sources.append([name, period, read, 0.0])
+
+    def poll(self):
+        '''
+        Reads every source that is due and returns the frames that are
+        now complete
+        '''
+        now = monotonic()
+        for source in self.sources:
+            if now >= source[3]:
+                sample = source[2]()
+                if sample is not None:
+                    self.aligner.push(source[0], sample[0], sample[1])
+                source[3] = now + source[1]
+        return self.aligner.poll()
+
+
+def dof_sampler(dof, period=0.01):
+    '''
+    Creates a Sampler for an Adafruit_10DOF board producing frames with
+    'accel', 'gyro', 'mag' and 'pressure' values every period seconds
+    '''
+    sampler = Sampler(Stream_aligner(period))
+    # Accelerometer at 100Hz (CTRL_REG1_A = 0x57), gyro at 95Hz (CTRL_REG1 = 0x0F)
+    sampler.add_source('accel', 0.01, dof.accel_get_stamped)
+    sampler.add_source('gyro', 1 / 95.0, dof.gyro_get_stamped)
+    # Magnetometer at its default 15Hz, barometer a few times per second
+    sampler.add_source('mag', 1 / 15.0, dof.mag_get_stamped, HOLD)
+    sampler.add_source('pressure', 0.2, dof.get_pressure_stamped, HOLD)
+    return sampler
+
+
+# Prints synchronized frames from the 10-DOF board
+if __name__ == '__main__':
+    from time import sleep
+    from Adafruit_10DOF import Adafruit_10DOF
+
+    sampler = dof_sampler(Adafruit_10DOF())
+    while True:
+        for frame in sampler.poll():
+            print(frame)
+        sleep(0.001)
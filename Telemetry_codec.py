@@ -0,0 +1,305 @@
+'''
+Created on Oct 19, 2026
+
+Compact binary encoding of sensor frames for sending over a slow
+link with Tcp_client.  Each value is quantized to the raw LSB units
+of its sensor, delta encoded against the previous frame and packed
+as a zigzag varint, so a frame of slowly changing readings takes a
+few bytes instead of a few hundred characters.  A keyframe holding
+absolute values is sent periodically so that a decoder that starts
+listening mid-stream, e.g. a ground station connecting to a rover
+that is already streaming, can resynchronize.  Decoding must start on
+a record boundary.
+
+Record format:
+    1 byte      KEYFRAME or DELTA
+    varints     timestamp then each value, in layout order
+'''
+import numpy as np
+
+# Record types
+KEYFRAME = 0
+DELTA = 1
+
+# Timestamps are sent in milliseconds
+TIME_LSB = 0.001
+
+# Size of one LSB of each channel in the units returned by Adafruit_10DOF.
+# These match the conversion constants in the drivers, which are not
+# imported since they need the I2C libraries of the Beaglebone.
+ACCEL_LSB = 0.001 * 9.80665         # 1 millig, m/s^2
+GYRO_LSB = 0.00875 * 0.017453293    # 8.75 mdps at 250dps, rad/s
+MAG_XY_LSB = 100 / 1100.0           # uT at gain +/- 1.3
+MAG_Z_LSB = 100 / 980.0             # uT at gain +/- 1.3
+PRESSURE_LSB = 1.0                  # Pa
+
+# Layout of a 10-DOF frame: (name, LSB of each axis).  Single axis
+# channels hold a number rather than a tuple.
+DOF_LAYOUT = [('accel', (ACCEL_LSB, ACCEL_LSB, ACCEL_LSB)),
+              ('gyro', (GYRO_LSB, GYRO_LSB, GYRO_LSB)),
+              ('mag', (MAG_XY_LSB, MAG_XY_LSB, MAG_Z_LSB)),
+              ('pressure', (PRESSURE_LSB,))]
+
+
+def layout_columns(layout):
+    '''
+    Returns the names of the decoded array columns for a layout, e.g.
+    ['timestamp', 'accel_x', 'accel_y', ...]
+    '''
+    columns = ['timestamp']
+    for (name, lsbs) in layout:
+        if len(lsbs) == 1:
+            columns.append(name)
+        else:
+            columns.extend(name + '_' + axis for axis in 'xyzw'[:len(lsbs)])
+    return columns
+
+
+def _put_varint(buf, n):
+    '''
+    Appends the signed integer n to buf as a zigzag varint
+    '''
+    n = (n << 1) if n >= 0 else ((-n << 1) - 1)
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+class Telemetry_encoder(object):
+    '''
+    Encodes a stream of sensor frames into delta compressed records
+    '''
+
+    # Frames between keyframes
+    KEYFRAME_INTERVAL = 50
+
+    def __init__(self, layout=DOF_LAYOUT, keyframe_interval=KEYFRAME_INTERVAL):
+        '''
+        Creates an encoder for frames with the given layout
+        '''
+        self.layout = layout
+        self.keyframe_interval = keyframe_interval
+        # (channel name, is_vector, axis count, 1 / LSB of each axis)
+        self._channels = [(name, len(lsbs) > 1, len(lsbs), [1.0 / lsb for lsb in lsbs])
+                          for (name, lsbs) in layout]
+        self._previous = None
+        self._count = 0
+
+    def force_keyframe(self):
+        '''
+        Makes the next encoded frame a keyframe, e.g. after a reconnect
+        '''
+        self._previous = None
+
+    def quantize(self, timestamp, values):
+        '''
+        Returns the frame as a list of integers in LSB units
+        '''
+        ints = [int(round(timestamp / TIME_LSB))]
+        for (name, is_vector, axes, scales) in self._channels:
+            value = values[name]
+            if is_vector:
+                for i in range(axes):
+                    ints.append(int(round(value[i] * scales[i])))
+            else:
+                ints.append(int(round(value * scales[0])))
+        return ints
+
+    def encode(self, timestamp, values):
+        '''
+        Encodes a frame given as a timestamp in seconds and a dict of
+        channel name -> value, and returns the record as bytes
+        '''
+        ints = self.quantize(timestamp, values)
+        buf = bytearray()
+        previous = self._previous
+        if previous is None or self._count >= self.keyframe_interval:
+            buf.append(KEYFRAME)
+            for n in ints:
+                _put_varint(buf, n)
+            self._count = 0
+        else:
+            buf.append(DELTA)
+            for (n, p) in zip(ints, previous):
+                _put_varint(buf, n - p)
+        self._previous = ints
+        self._count += 1
+        return bytes(buf)
+
+    def encode_frame(self, frame):
+        '''
+        Encodes a Sensor_sync.Sync_frame
+        '''
+        return self.encode(frame.timestamp, frame.values)
+
+
+class Telemetry_decoder(object):
+    '''
+    Decodes records from a Telemetry_encoder into NumPy arrays.  Data
+    may be fed in arbitrary chunks as it is read from the connection;
+    incomplete records are kept until the rest arrives.  On a corrupt
+    record the decoder skips ahead to the next keyframe it can trust,
+    counting the loss in resyncs and skipped_bytes.
+    '''
+
+    # While resyncing, a keyframe is only trusted if its timestamp is no
+    # earlier than the last good frame and at most this many seconds later
+    RESYNC_WINDOW = 60.0
+
+    def __init__(self, layout=DOF_LAYOUT):
+        '''
+        Creates a decoder for frames with the given layout
+        '''
+        self.layout = layout
+        self.columns = layout_columns(layout)
+        self._width = len(self.columns)
+        self._scales = np.array([TIME_LSB] + [lsb for (name, lsbs) in layout for lsb in lsbs])
+        self._pending = bytearray()
+        self._previous = None
+        self._last_time = None
+        self._resyncing = False
+
+        # Metrics
+        self.resyncs = 0         # corrupt records skipped over
+        self.skipped_bytes = 0   # bytes dropped while resyncing
+
+    def _record(self, data, pos, end):
+        '''
+        Parses the integers of the record whose type byte is at pos.
+        Returns them and the position after the record, or None if the
+        record is incomplete.
+        '''
+        width = self._width
+        record = []
+        i = pos + 1
+        while len(record) < width:
+            n = 0
+            shift = 0
+            while i < end:
+                byte = data[i]
+                i += 1
+                n |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            else:
+                # Ran out of data in the middle of a record
+                return None
+            record.append((n >> 1) if not n & 1 else -((n + 1) >> 1))
+        return (record, i)
+
+    def _plausible(self, timestamp):
+        '''
+        Returns True if a keyframe found while resyncing has a timestamp
+        that can follow the last good frame
+        '''
+        if self._last_time is None:
+            return timestamp > 0
+        return self._last_time <= timestamp <= self._last_time + int(self.RESYNC_WINDOW / TIME_LSB)
+
+    def _parse(self):
+        '''
+        Splits the pending bytes into complete records.  Returns a list of
+        record types, a flat list of their integers and the number of
+        records before the last corrupt one, or None if there was none.
+        '''
+        data = self._pending
+        kinds = []
+        ints = []
+        resync = None
+        pos = 0
+        end = len(data)
+        while pos < end:
+            kind = data[pos]
+            if self._resyncing or (kind != KEYFRAME and kind != DELTA):
+                if not self._resyncing:
+                    self._resyncing = True
+                    self.resyncs += 1
+                    resync = len(kinds)
+                # Zero deltas are also zero bytes, so only trust a keyframe
+                # at the next zero byte if its timestamp makes sense
+                found = data.find(b'\x00', pos)
+                if found < 0:
+                    self.skipped_bytes += end - pos
+                    pos = end
+                    break
+                self.skipped_bytes += found - pos
+                pos = found
+                parsed = self._record(data, pos, end)
+                if parsed is None:
+                    break
+                if not self._plausible(parsed[0][0]):
+                    self.skipped_bytes += 1
+                    pos += 1
+                    continue
+                self._resyncing = False
+                kind = KEYFRAME
+            else:
+                parsed = self._record(data, pos, end)
+                if parsed is None:
+                    break
+            kinds.append(kind)
+            ints.extend(parsed[0])
+            pos = parsed[1]
+        del data[:pos]
+        return (kinds, ints, resync)
+
+    def decode(self, data):
+        '''
+        Decodes a chunk of data and returns an (n, columns) float array of
+        the complete frames in it, with the timestamp in seconds in column
+        0.  Delta frames received before the first keyframe, or between a
+        corrupt record and the next keyframe, are dropped.
+        '''
+        self._pending.extend(data)
+        (kinds, ints, resync) = self._parse()
+        rows = np.array(ints, dtype=np.int64).reshape(len(kinds), self._width)
+        is_key = np.array(kinds, dtype=np.int64) == KEYFRAME
+        if resync is None:
+            return self._frames(rows, is_key)
+
+        # Deltas after the corrupt record cannot continue the earlier frames
+        before = self._frames(rows[:resync], is_key[:resync])
+        self._previous = None
+        return np.vstack((before, self._frames(rows[resync:], is_key[resync:])))
+
+    def _frames(self, rows, is_key):
+        '''
+        Reconstructs the scaled frames of parsed records, continuing from
+        the last frame decoded
+        '''
+        # Continue from the last frame of the previous chunk if we have
+        # one, otherwise skip ahead to the first keyframe
+        continued = self._previous is not None
+        if continued:
+            rows = np.vstack((self._previous, rows))
+            is_key = np.concatenate(([True], is_key))
+        elif is_key.any():
+            first = int(np.argmax(is_key))
+            rows = rows[first:]
+            is_key = is_key[first:]
+        else:
+            return np.empty((0, self._width))
+
+        # Each frame is its keyframe plus the deltas since: a running sum
+        # restarted at every keyframe
+        csum = np.cumsum(rows, axis=0)
+        key_index = np.maximum.accumulate(np.where(is_key, np.arange(len(rows)), 0))
+        base = csum[key_index] - rows[key_index]
+        frames = csum - base
+
+        self._previous = frames[-1:].copy()
+        self._last_time = int(frames[-1, 0])
+        if continued:
+            frames = frames[1:]
+        return frames * self._scales
+
+    def reset(self):
+        '''
+        Discards buffered data and waits for the next keyframe
+        '''
+        del self._pending[:]
+        self._previous = None
+        self._last_time = None
+        self._resyncing = False
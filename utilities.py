@@ -5,10 +5,15 @@ Utilities.
 
 import math
 
+import numpy as np
 
-def class Vec2:
+
+class Vec2(object):
 	""" Class for a 2D vector."""
 	
+	# No per-instance __dict__, vectors are created in tight loops
+	__slots__ = ('x', 'y')
+	
 	def __init__(self, x=0,y=0):
 		self.x = float(x)
 		self.y = float(y)
@@ -16,33 +21,42 @@ def class Vec2:
 	def __add__(self, other):
 		return Vec2(self.x + other.x, self.y + other.y)
 	
+	def __sub__(self, other):
+		return Vec2(self.x - other.x, self.y - other.y)
+	
 	def __iadd__(self, other):
 		""" self += other """
-		self.x = self.x + other.x
-		self.y = self.y + other.y
+		self.x += other.x
+		self.y += other.y
 		return self
 	
 	def __isub__(self, other):
 		""" self -= other """
-		self.x = self.x - other.x
-		self.y = self.y - other.y
+		self.x -= other.x
+		self.y -= other.y
 		return self
 	
 	def __div__(self, val):
-		return Vec2( self[0] / val, self[1] / val )
+		return Vec2(self.x / val, self.y / val)
 	
 	def __mul__(self, val):
-		return Vec2( self[0] * val, self[1] * val )
+		return Vec2(self.x * val, self.y * val)
+	
+	__rmul__ = __mul__
 	
 	def __idiv__(self, val):
-		self[0] = self[0] / val
-		self[1] = self[1] / val
+		self.x /= val
+		self.y /= val
 		return self
 		
 	def __imul__(self, val):
-		self[0] = self[0] * val
-		self[1] = self[1] * val
+		self.x *= val
+		self.y *= val
 		return self
+	
+	# Python 3 names of the division operators
+	__truediv__ = __div__
+	__itruediv__ = __idiv__
 				
 	def __getitem__(self, key):
 		if( key == 0):
@@ -64,24 +78,197 @@ def class Vec2:
 		return "(" + str(self.x) + "," + str(self.y) + ")"
 		
 	def __eq__(self, other):
-		return (self.x == other.x && self.y == other.y)
+		return (self.x == other.x and self.y == other.y)
 	def __ne__(self, other):
-		return (self.x != other.x || self.y != other.y)
+		return (self.x != other.x or self.y != other.y)
 		
+	def set(self, x, y):
+		" sets both components in place"
+		self.x = float(x)
+		self.y = float(y)
+		return self
+	
 	def length_squared(self):
-		return (self.x ** 2 + self.y ** 2)
+		return (self.x * self.x + self.y * self.y)
 	
 	def length(self):
-		return math.sqrt(self.length_squared())
+		return math.sqrt(self.x * self.x + self.y * self.y)
 	
 	def normalize(self):
 		" normalizes the vector"
-		self /= self.length()
+		length = math.sqrt(self.x * self.x + self.y * self.y)
+		self.x /= length
+		self.y /= length
+		return self
 	
 	def normalized(self):
 		" returns a new vector that is a normalized version of self"
-		return (self / self.length())
+		length = math.sqrt(self.x * self.x + self.y * self.y)
+		return Vec2(self.x / length, self.y / length)
+	
+	def rotate(self, angle):
+		" rotates the vector counterclockwise by angle radians"
+		c = math.cos(angle)
+		s = math.sin(angle)
+		(self.x, self.y) = (self.x * c - self.y * s, self.x * s + self.y * c)
+		return self
+
+
+class Vec2Array(object):
+	"""
+	N 2D vectors stored in one contiguous (N, 2) float array, for doing
+	the same vector math on many vectors (e.g. waypoints) in one call.
+	"""
+
+	__slots__ = ('data',)
+
+	def __init__(self, data=0):
+		"""
+		data: an (N, 2) array, a sequence of Vec2 or (x, y) pairs, or a
+		count of zero vectors to allocate.  A contiguous float array is
+		used as the storage directly, not copied.
+		"""
+		if isinstance(data, int):
+			self.data = np.zeros((data, 2))
+		elif isinstance(data, np.ndarray):
+			self.data = np.ascontiguousarray(data, dtype=float).reshape(-1, 2)
+		else:
+			self.data = np.array([(v[0], v[1]) for v in data], dtype=float).reshape(-1, 2)
+
+	@classmethod
+	def from_xy(cls, x, y):
+		" creates an array from separate x and y component arrays"
+		return cls(np.column_stack((x, y)))
+
+	@property
+	def x(self):
+		" view of the x components"
+		return self.data[:, 0]
+
+	@property
+	def y(self):
+		" view of the y components"
+		return self.data[:, 1]
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, key):
+		" returns a copy: a Vec2 for an index, a new Vec2Array for a slice"
+		if isinstance(key, slice):
+			return Vec2Array(self.data[key].copy())
+		return Vec2(self.data[key, 0], self.data[key, 1])
+
+	def __setitem__(self, key, value):
+		self.data[key, 0] = value[0]
+		self.data[key, 1] = value[1]
+
+	def __iter__(self):
+		for (x, y) in self.data.tolist():
+			yield Vec2(x, y)
+
+	def __str__(self):
+		return str(self.data)
+
+	@staticmethod
+	def _operand(other):
+		" lets Vec2 and Vec2Array operands broadcast against the data"
+		if isinstance(other, Vec2Array):
+			return other.data
+		if isinstance(other, Vec2):
+			return (other.x, other.y)
+		return other
+
+	def __add__(self, other):
+		return Vec2Array(self.data + self._operand(other))
+
+	def __sub__(self, other):
+		return Vec2Array(self.data - self._operand(other))
+
+	def __iadd__(self, other):
+		self.data += self._operand(other)
+		return self
+
+	def __isub__(self, other):
+		self.data -= self._operand(other)
+		return self
+
+	def _scale(self, val):
+		" turns a per-vector array of scales into a column"
+		val = np.asarray(val, dtype=float)
+		return val[:, np.newaxis] if val.ndim == 1 else val
+
+	def __mul__(self, val):
+		return Vec2Array(self.data * self._scale(val))
+
+	__rmul__ = __mul__
+
+	def __div__(self, val):
+		return Vec2Array(self.data / self._scale(val))
+
+	def __imul__(self, val):
+		self.data *= self._scale(val)
+		return self
+
+	def __idiv__(self, val):
+		self.data /= self._scale(val)
+		return self
+
+	__truediv__ = __div__
+	__itruediv__ = __idiv__
+
+	def dot(self, other):
+		" returns the dot product of each vector with other"
+		other = self._operand(other)
+		if isinstance(other, tuple):
+			return self.data[:, 0] * other[0] + self.data[:, 1] * other[1]
+		return np.einsum('ij,ij->i', self.data, other)
+
+	def lengths_squared(self):
+		return np.einsum('ij,ij->i', self.data, self.data)
+
+	def lengths(self):
+		return np.sqrt(self.lengths_squared())
+
+	def normalize(self):
+		" normalizes every vector in place, leaving zero vectors as zero"
+		lengths = self.lengths()
+		lengths[lengths == 0] = 1.0
+		self.data /= lengths[:, np.newaxis]
+		return self
+
+	def normalized(self):
+		" returns a new array of the normalized vectors"
+		return Vec2Array(self.data.copy()).normalize()
+
+	def rotate(self, angles):
+		" rotates every vector counterclockwise in place by one angle or an array of angles in radians"
+		c = np.cos(angles)
+		s = np.sin(angles)
+		x = self.data[:, 0].copy()
+		y = self.data[:, 1]
+		self.data[:, 0] = x * c - y * s
+		self.data[:, 1] = x * s + y * c
+		return self
+
+	def rotated(self, angles):
+		" returns a new array of the rotated vectors"
+		return Vec2Array(self.data.copy()).rotate(angles)
+
 
+# distance from wheel to center of gravity in x direction plus distance from wheel to center of gravity in y direction.
+WHEEL_TO_COG = 1.0
 
+# ground speed in m/s of the rover driving straight with a linear velocity of length 1 (all motors at full speed).
+FULL_SCALE_SPEED = 1.0
 
 
+def wheel_speeds(x, y, angular_velocity):
+	"""
+	Returns the unclamped (front_left, front_right, back_left, back_right) motor
+	speeds for a body velocity.  Works on floats or on NumPy arrays of velocities.
+	"""
+	return (x - y - WHEEL_TO_COG * angular_velocity,
+		x + y + WHEEL_TO_COG * angular_velocity,
+		x + y - WHEEL_TO_COG * angular_velocity,
+		x - y + WHEEL_TO_COG * angular_velocity)